@@ -0,0 +1,89 @@
+"""
+Dynamic micro-batching of query embeddings for the retrieval API.
+
+Concurrent requests each await ``EmbedBatcher.embed``; a background task drains
+the queue, waiting briefly for more arrivals, and encodes the whole batch in one
+forward pass on the supplied executor.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_MAX_BATCH = 16
+DEFAULT_MAX_WAIT_SECONDS = 0.005
+
+PendingQuery = Tuple[str, "asyncio.Future[np.ndarray]"]
+
+
+class EmbedBatcher:
+    """Coalesce concurrent query embeddings into batched encoder calls."""
+
+    def __init__(
+        self,
+        encode: Callable[[Sequence[str]], np.ndarray],
+        executor: Optional[Executor] = None,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_wait: float = DEFAULT_MAX_WAIT_SECONDS,
+    ) -> None:
+        self._encode = encode
+        self._executor = executor
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue[PendingQuery]] = None
+        self._worker: Optional[asyncio.Task[None]] = None
+
+    async def embed(self, query: str) -> np.ndarray:
+        """Return the embedding for ``query``, sharing a batch with concurrent calls."""
+        queue = self._ensure_worker()
+        future: asyncio.Future[np.ndarray] = asyncio.get_running_loop().create_future()
+        await queue.put((query, future))
+        return await future
+
+    def _ensure_worker(self) -> asyncio.Queue[PendingQuery]:
+        """Start the drain task on the running loop (re-created if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._drain(self._queue))
+        assert self._queue is not None
+        return self._queue
+
+    async def _collect(self, queue: asyncio.Queue[PendingQuery]) -> List[PendingQuery]:
+        """Wait for one request, then gather more until the batch fills or times out."""
+        loop = asyncio.get_running_loop()
+        batch = [await queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _drain(self, queue: asyncio.Queue[PendingQuery]) -> None:
+        """Encode queued queries batch by batch and resolve their futures."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect(queue)
+            unique = list(dict.fromkeys(query for query, _ in batch))
+            try:
+                vectors = await loop.run_in_executor(self._executor, self._encode, unique)
+            except Exception as exc:  # propagate encoder failures to every caller
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            rows = dict(zip(unique, vectors))
+            for query, future in batch:
+                if not future.done():
+                    future.set_result(rows[query])
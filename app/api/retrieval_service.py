@@ -4,10 +4,20 @@ High-level retrieval entrypoint for UI integration.
 
 from __future__ import annotations
 
-from typing import List, TypedDict
+import asyncio
+import threading
+from typing import List, Optional, Sequence, Tuple, TypedDict
+
+import faiss
+import numpy as np
 
 from app import search as search_module
 
+QUERY_CACHE_SIZE = 512
+# Cosine similarity above which a previously answered query is reused.
+SEMANTIC_HIT_THRESHOLD = 0.97
+SEMANTIC_LOOKUP_NEIGHBORS = 8
+
 
 class RetrievalResult(TypedDict):
     id: str
@@ -19,11 +29,139 @@ class RetrievalResult(TypedDict):
     preview: str
 
 
-def retrieve(query: str, top_k: int = 5, rerank: bool = True) -> List[RetrievalResult]:
+class SemanticResultCache:
+    """
+    Bounded cache of retrieval results keyed by query embedding.
+
+    Lookups return the stored results of any earlier query whose embedding has
+    cosine similarity of at least ``threshold`` with the new one and was run with
+    the same ``top_k``/``rerank`` options. The oldest entry is evicted first.
+    """
+
+    def __init__(
+        self, maxsize: int = QUERY_CACHE_SIZE, threshold: float = SEMANTIC_HIT_THRESHOLD
+    ) -> None:
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._index: Optional[faiss.IndexFlatIP] = None
+        self._entries: List[Tuple[Tuple[int, bool], List[RetrievalResult]]] = []
+
+    def lookup(
+        self, vector: np.ndarray, top_k: int, rerank: bool
+    ) -> Optional[List[RetrievalResult]]:
+        """Return cached results for a near-identical query, or None on a miss."""
+        with self._lock:
+            if self._index is None or self._index.ntotal == 0:
+                return None
+            neighbors = min(self._index.ntotal, SEMANTIC_LOOKUP_NEIGHBORS)
+            scores, indices = self._index.search(vector.reshape(1, -1), neighbors)
+            for score, idx in zip(scores[0], indices[0]):
+                if idx < 0 or score < self.threshold:
+                    break
+                options, results = self._entries[idx]
+                if options == (top_k, rerank):
+                    return [RetrievalResult(**item) for item in results]
+        return None
+
+    def store(
+        self,
+        vector: np.ndarray,
+        top_k: int,
+        rerank: bool,
+        results: List[RetrievalResult],
+    ) -> None:
+        """Remember ``results`` for ``vector``, evicting the oldest entry if full."""
+        with self._lock:
+            if self._index is None:
+                self._index = faiss.IndexFlatIP(vector.shape[-1])
+            if len(self._entries) >= self.maxsize:
+                self._index.remove_ids(np.array([0], dtype=np.int64))
+                self._entries.pop(0)
+            self._index.add(vector.reshape(1, -1))
+            snapshot = [RetrievalResult(**item) for item in results]
+            self._entries.append(((top_k, rerank), snapshot))
+
+
+RESULT_CACHE = SemanticResultCache()
+
+
+def artifacts_ready() -> bool:
+    """Return True when the on-disk retrieval artifacts are available."""
+    return search_module.ARTIFACT_STORE.is_ready()
+
+
+def warmup() -> None:
+    """Load the retrieval models and index ahead of the first query."""
+    search_module.warmup()
+
+
+def cached_query_vector(query: str) -> Optional[np.ndarray]:
+    """Return the LRU-cached embedding for ``query`` without encoding, or None."""
+    return search_module.ARTIFACT_STORE.cached_query_embedding(query)
+
+
+def embed_queries(queries: Sequence[str]) -> np.ndarray:
+    """Encode a batch of queries, serving repeats from the embedding LRU."""
+    return search_module.ARTIFACT_STORE.encode_queries(queries)
+
+
+def retrieve(
+    query: str,
+    top_k: int = 5,
+    rerank: bool = True,
+    query_vector: Optional[np.ndarray] = None,
+) -> List[RetrievalResult]:
     """
     Retrieve top-k passages for the given query.
 
     Delegates directly to app.search.search so the UI can import a simple callable
-    without worrying about CLI arguments or artifact wiring.
+    without worrying about CLI arguments or artifact wiring. Query embeddings and
+    results are cached, so repeated or near-identical queries skip the encoder and
+    the FAISS/reranker pass. Pass ``query_vector`` when the query was already
+    embedded (e.g. by a request batcher).
     """
-    return search_module.search(query=query, top_k=top_k, rerank=rerank)
+    if not artifacts_ready():
+        # Let search raise its usual missing-artifact error before loading a model.
+        return search_module.search(query=query, top_k=top_k, rerank=rerank)
+
+    if query_vector is None:
+        query_vector = search_module.ARTIFACT_STORE.encode_query(query)
+    cached = RESULT_CACHE.lookup(query_vector, top_k, rerank)
+    if cached is not None:
+        return cached
+    results = search_module.search(
+        query=query, top_k=top_k, rerank=rerank, query_vector=query_vector
+    )
+    RESULT_CACHE.store(query_vector, top_k, rerank, results)
+    return results
+
+
+async def retrieve_async(
+    query: str,
+    top_k: int = 5,
+    rerank: bool = True,
+    query_vector: Optional[np.ndarray] = None,
+) -> List[RetrievalResult]:
+    """
+    Awaitable `retrieve` backed by app.search.search_async.
+
+    Cache lookups run inline; encoding, the FAISS scan, and reranking are handed to
+    the search module's thread pools so the event loop keeps serving requests.
+    """
+    if not artifacts_ready():
+        return await search_module.search_async(query=query, top_k=top_k, rerank=rerank)
+
+    if query_vector is None:
+        loop = asyncio.get_running_loop()
+        query_vector = await loop.run_in_executor(
+            search_module.ENCODE_POOL, search_module.ARTIFACT_STORE.encode_query, query
+        )
+    cached = RESULT_CACHE.lookup(query_vector, top_k, rerank)
+    if cached is not None:
+        return cached
+    results = await search_module.search_async(
+        query=query, top_k=top_k, rerank=rerank, query_vector=query_vector
+    )
+    RESULT_CACHE.store(query_vector, top_k, rerank, results)
+    return results
@@ -7,15 +7,28 @@ Run with:
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import List
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 import uvicorn
 
-from app.api.retrieval_service import retrieve, RetrievalResult
+from app.api.embed_batcher import EmbedBatcher
+from app.api.retrieval_service import (
+    artifacts_ready,
+    cached_query_vector,
+    embed_queries,
+    retrieve_async,
+    RetrievalResult,
+    warmup,
+)
+from app.search import ENCODE_POOL
 
 LOGGER = logging.getLogger(__name__)
 
@@ -25,6 +38,12 @@ API_DESCRIPTION = (
 )
 DEFAULT_TOP_K = 5
 MAX_TOP_K = 10
+API_WORKERS = int(os.environ.get("SYMPHONIC_API_WORKERS", "1"))
+
+# Queries arriving within a few milliseconds share one encoder forward pass. Model
+# calls share app.search's single-threaded ENCODE_POOL so concurrent requests queue
+# for the GPU/cores instead of oversubscribing them.
+EMBED_BATCHER = EmbedBatcher(embed_queries, executor=ENCODE_POOL)
 
 
 class SearchRequest(BaseModel):
@@ -56,7 +75,27 @@ class SearchResponseItem(BaseModel):
     preview: str
 
 
-app = FastAPI(title=API_TITLE, description=API_DESCRIPTION, version="0.1.0")
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Warm the retrieval stack once per worker so first requests skip cold start."""
+    if artifacts_ready():
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(ENCODE_POOL, warmup)
+        except Exception:  # pragma: no cover - requests retry the lazy load
+            LOGGER.exception("Retrieval warmup failed; models will load on demand.")
+    else:
+        LOGGER.warning("Retrieval artifacts missing; skipping warmup.")
+    yield
+
+
+app = FastAPI(
+    lifespan=lifespan,
+    title=API_TITLE,
+    description=API_DESCRIPTION,
+    version="0.1.0",
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -79,10 +118,12 @@ def health() -> dict[str, str]:
 
 @app.post(
     "/api/search",
-    response_model=List[SearchResponseItem],
     summary="Query the Symphonic Prompting corpus",
+    # Documentation only: results come from app.search already shaped, so they are
+    # serialised directly instead of being re-validated through SearchResponseItem.
+    responses={200: {"model": List[SearchResponseItem]}},
 )
-def search_endpoint(payload: SearchRequest) -> List[RetrievalResult]:
+async def search_endpoint(payload: SearchRequest) -> ORJSONResponse:
     """
     Execute a semantic retrieval query against the local FAISS index.
 
@@ -91,7 +132,19 @@ def search_endpoint(payload: SearchRequest) -> List[RetrievalResult]:
             any other unexpected failure.
     """
     try:
-        return retrieve(query=payload.query, top_k=payload.top_k, rerank=payload.rerank)
+        query_vector = None
+        if artifacts_ready():
+            # Repeated queries reuse their cached embedding; only misses are batched
+            # (and written back to the cache by the encoder).
+            query_vector = cached_query_vector(payload.query)
+            if query_vector is None:
+                query_vector = await EMBED_BATCHER.embed(payload.query)
+        results: List[RetrievalResult] = await retrieve_async(
+            query=payload.query,
+            top_k=payload.top_k,
+            rerank=payload.rerank,
+            query_vector=query_vector,
+        )
     except FileNotFoundError as exc:
         LOGGER.exception("Retrieval artifacts missing.")
         raise HTTPException(status_code=503, detail=str(exc)) from exc
@@ -100,16 +153,23 @@ def search_endpoint(payload: SearchRequest) -> List[RetrievalResult]:
     except Exception as exc:  # pragma: no cover - defensive guardrail
         LOGGER.exception("Unexpected retrieval failure.")
         raise HTTPException(status_code=500, detail="Retrieval failed.") from exc
+    return ORJSONResponse(content=results)
 
 
 def run() -> None:
-    """Start the local-only uvicorn server."""
+    """
+    Start the local-only uvicorn server.
+
+    Set ``SYMPHONIC_API_WORKERS`` to run several worker processes; each loads its
+    own copy of the models.
+    """
     uvicorn.run(
         "app.api.server:app",
         host="127.0.0.1",
         port=8000,
         log_level="info",
         reload=False,
+        workers=API_WORKERS,
     )
 
 
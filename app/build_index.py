@@ -4,19 +4,26 @@ Embedding and index builder for Symphonic Prompting.
 Pipeline:
     1. Load chunk metadata from app/data/symphonic_chunks.jsonl
     2. Encode chunks with intfloat/e5-large-v2 (SentenceTransformer)
-    3. Persist embeddings, ids, FAISS index, and metadata manifest
+    3. Persist float16 embeddings, ids, FAISS index, and metadata manifest
+
+The C-contiguous embeddings can be mapped with ``np.load(path, mmap_mode="r")``
+so processes share their pages. ``faiss.read_index(path, faiss.IO_FLAG_MMAP)``
+only maps the inverted lists of the IVF-PQ index used for large corpora; the
+default HNSW index (under 50k vectors) is still read fully into each process.
 """
 
 from __future__ import annotations
 
 import argparse
 import json
+import math
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Sequence
+from typing import List, Optional, Sequence, Union
 
 import faiss
 import numpy as np
+import orjson
 import torch
 from sentence_transformers import SentenceTransformer
 
@@ -33,6 +40,17 @@ META_PATH = INDEX_DIR / "meta.json"
 
 DEFAULT_MODEL_NAME = "intfloat/e5-large-v2"
 DEFAULT_BATCH_SIZE = 16
+CUDA_BATCH_SIZE = 64
+ONNX_MAX_LENGTH = 512
+
+# Corpora below this size use HNSW; larger ones switch to compressed IVF-PQ.
+HNSW_MAX_VECTORS = 50_000
+HNSW_NEIGHBORS = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+IVF_PQ_SUBQUANTIZERS = 64
+IVF_PQ_BITS = 8
+IVF_DEFAULT_NPROBE = 16
 
 
 def _load_chunks(path: Path) -> List[dict]:
@@ -43,7 +61,7 @@ def _load_chunks(path: Path) -> List[dict]:
             line = line.strip()
             if not line:
                 continue
-            chunks.append(json.loads(line))
+            chunks.append(orjson.loads(line))
     return chunks
 
 
@@ -53,12 +71,162 @@ def _prepare_texts(chunks: Sequence[dict]) -> List[str]:
 
 
 def _load_model(model_name: str) -> SentenceTransformer:
-    """Instantiate the embedding model on GPU when available, else CPU."""
+    """
+    Instantiate the embedding model on GPU when available, else CPU.
+
+    On CUDA the weights are cast to fp16 so encoder matmuls run on tensor cores.
+    """
     device = "cuda" if torch.cuda.is_available() else "cpu"
     model = SentenceTransformer(model_name, device=device)
+    if device == "cuda":
+        model = model.half()
     return model
 
 
+class OnnxEncoder:
+    """
+    Mean-pooling passage encoder backed by an exported ONNX graph.
+
+    Expects a directory produced by
+    ``optimum-cli export onnx --model intfloat/e5-large-v2 <dir>`` holding
+    ``model.onnx`` alongside the tokenizer files. Mirrors the subset of
+    ``SentenceTransformer.encode`` used by the index builder.
+    """
+
+    def __init__(self, model_dir: Path, max_length: int = ONNX_MAX_LENGTH) -> None:
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        available = ort.get_available_providers()
+        providers = [
+            provider
+            for provider in ("CUDAExecutionProvider", "CPUExecutionProvider")
+            if provider in available
+        ]
+        self.session = ort.InferenceSession(
+            str(model_dir / "model.onnx"), providers=providers
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir), use_fast=True)
+        self.input_names = [node.name for node in self.session.get_inputs()]
+        self.max_length = max_length
+        on_cuda = "CUDAExecutionProvider" in self.session.get_providers()
+        self.device = torch.device("cuda" if on_cuda else "cpu")
+
+    def encode(
+        self,
+        texts: Sequence[str],
+        batch_size: int,
+        normalize_embeddings: bool = True,
+        **_: object,
+    ) -> np.ndarray:
+        """Encode ``texts`` into mean-pooled sentence embeddings."""
+        batches: List[np.ndarray] = []
+        for start in range(0, len(texts), batch_size):
+            stop = start + batch_size
+            tokens = self.tokenizer(
+                list(texts[start:stop]),
+                padding=True,
+                truncation=True,
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            feeds = {name: tokens[name] for name in self.input_names}
+            hidden = self.session.run(None, feeds)[0]
+            mask = tokens["attention_mask"][..., None].astype(np.float32)
+            summed = (hidden * mask).sum(axis=1)
+            batches.append(summed / np.clip(mask.sum(axis=1), 1e-9, None))
+        embeddings = np.concatenate(batches).astype(np.float32)
+        if normalize_embeddings:
+            faiss.normalize_L2(embeddings)
+        return embeddings
+
+
+Encoder = Union[SentenceTransformer, OnnxEncoder]
+
+
+def _encode_length_sorted(
+    model: Encoder, texts: Sequence[str], batch_size: int
+) -> np.ndarray:
+    """
+    Encode ``texts`` shortest-first so each batch pads to a similar length.
+
+    Returned rows are restored to the original ``texts`` order as one contiguous
+    fp32 matrix, L2-normalised in place by FAISS rather than per batch by the model.
+    On multi-GPU hosts the PyTorch encoder runs one worker process per device.
+    """
+    order = np.argsort([len(text) for text in texts], kind="stable")
+    sorted_texts = [texts[i] for i in order]
+    if isinstance(model, SentenceTransformer) and torch.cuda.device_count() > 1:
+        pool = model.start_multi_process_pool()
+        try:
+            embeddings = model.encode_multi_process(
+                sorted_texts, pool, batch_size=batch_size
+            )
+        finally:
+            model.stop_multi_process_pool(pool)
+    else:
+        embeddings = model.encode(
+            sorted_texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=False,
+            show_progress_bar=False,
+        )
+    embeddings = np.ascontiguousarray(embeddings[np.argsort(order)], dtype=np.float32)
+    faiss.normalize_L2(embeddings)
+    return embeddings
+
+
+def _build_faiss_index(embeddings: np.ndarray) -> faiss.Index:
+    """
+    Build an inner-product ANN index sized to the corpus.
+
+    Small corpora use HNSW (no training, near-exact recall); larger ones use
+    IVF-PQ with ``4 * sqrt(N)`` coarse lists so queries only scan ``nprobe``
+    compressed lists. Search-time knobs are persisted with the index.
+    """
+    count, dim = embeddings.shape
+    if count < HNSW_MAX_VECTORS:
+        index = faiss.IndexHNSWFlat(dim, HNSW_NEIGHBORS, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+        index.add(embeddings)
+        return index
+
+    nlist = int(4 * math.sqrt(count))
+    quantizer = faiss.IndexFlatIP(dim)
+    index = faiss.IndexIVFPQ(
+        quantizer,
+        dim,
+        nlist,
+        IVF_PQ_SUBQUANTIZERS,
+        IVF_PQ_BITS,
+        faiss.METRIC_INNER_PRODUCT,
+    )
+    index.train(embeddings)
+    index.add(embeddings)
+    index.nprobe = IVF_DEFAULT_NPROBE
+    return index
+
+
+def _describe_index(index: faiss.Index) -> dict:
+    """Summarise the index type and search parameters for meta.json."""
+    if isinstance(index, faiss.IndexHNSW):
+        return {
+            "type": "HNSWFlat",
+            "neighbors": HNSW_NEIGHBORS,
+            "ef_construction": index.hnsw.efConstruction,
+            "ef_search": index.hnsw.efSearch,
+        }
+    return {
+        "type": "IVFPQ",
+        "nlist": index.nlist,
+        "nprobe": index.nprobe,
+        "subquantizers": IVF_PQ_SUBQUANTIZERS,
+        "bits": IVF_PQ_BITS,
+    }
+
+
 def build_embeddings(
     chunks_path: Path = CHUNKS_JSONL_PATH,
     embeddings_path: Path = EMBEDDINGS_PATH,
@@ -66,26 +234,34 @@ def build_embeddings(
     faiss_path: Path = FAISS_INDEX_PATH,
     meta_path: Path = META_PATH,
     model_name: str = DEFAULT_MODEL_NAME,
-    batch_size: int = DEFAULT_BATCH_SIZE,
+    batch_size: Optional[int] = None,
+    onnx_model_path: Optional[Path] = None,
 ) -> None:
-    """Encode all chunks, persist embeddings, and build the FAISS index."""
+    """
+    Encode all chunks, persist embeddings, and build the FAISS index.
+
+    ``batch_size`` defaults to a larger value on CUDA than on CPU. When
+    ``onnx_model_path`` points at an ONNX export of ``model_name``, passages are
+    encoded through ONNX Runtime instead of PyTorch.
+    """
     chunks = _load_chunks(chunks_path)
     if not chunks:
         raise ValueError(f"No chunks found at {chunks_path}. Run app.chunking first.")
 
-    model = _load_model(model_name)
+    model: Encoder
+    if onnx_model_path is not None:
+        model = OnnxEncoder(onnx_model_path)
+    else:
+        model = _load_model(model_name)
+    # Resolved up front: the multi-GPU pool moves the model to CPU while encoding.
+    device = model.device
+    if batch_size is None:
+        batch_size = CUDA_BATCH_SIZE if device.type == "cuda" else DEFAULT_BATCH_SIZE
     texts = _prepare_texts(chunks)
-    embeddings = model.encode(
-        texts,
-        batch_size=batch_size,
-        convert_to_numpy=True,
-        normalize_embeddings=True,
-        show_progress_bar=False,
-    ).astype("float32")
+    embeddings = _encode_length_sorted(model, texts, batch_size)
 
     dim = embeddings.shape[1]
-    index = faiss.IndexFlatIP(dim)
-    index.add(embeddings)
+    index = _build_faiss_index(embeddings)
 
     index_count = index.ntotal
     if index_count != len(chunks):
@@ -93,7 +269,8 @@ def build_embeddings(
 
     INDEX_DIR.mkdir(exist_ok=True)
 
-    np.save(embeddings_path, embeddings)
+    # FAISS consumes the fp32 matrix above; the on-disk copy only needs half precision.
+    np.save(embeddings_path, np.ascontiguousarray(embeddings, dtype=np.float16))
     ids = [chunk["id"] for chunk in chunks]
     ids_path.write_text(json.dumps(ids, ensure_ascii=False, indent=2), encoding="utf-8")
     faiss.write_index(index, str(faiss_path))
@@ -101,7 +278,9 @@ def build_embeddings(
     meta = {
         "model_name": model_name,
         "embedding_dimension": dim,
+        "embedding_dtype": "float16",
         "chunk_count": len(chunks),
+        "index": _describe_index(index),
         "built_at": datetime.now(tz=timezone.utc).isoformat(),
         "paths": {
             "chunks": str(chunks_path),
@@ -110,7 +289,12 @@ def build_embeddings(
             "faiss": str(faiss_path),
         },
         "batch_size": batch_size,
-        "device": str(model.device),
+        "device": str(device),
+        "encoder_dtype": (
+            "onnx"
+            if isinstance(model, OnnxEncoder)
+            else str(next(model.parameters()).dtype)
+        ),
     }
     meta_path.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
 
@@ -126,7 +310,20 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--faiss-path", type=Path, default=FAISS_INDEX_PATH)
     parser.add_argument("--meta-path", type=Path, default=META_PATH)
     parser.add_argument("--model-name", type=str, default=DEFAULT_MODEL_NAME)
-    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument(
+        "--onnx-model-path",
+        type=Path,
+        default=None,
+        help="Directory holding an ONNX export of the embedding model "
+        "(encodes via onnxruntime instead of PyTorch).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help=f"Encode batch size (default {CUDA_BATCH_SIZE} on CUDA, "
+        f"{DEFAULT_BATCH_SIZE} on CPU).",
+    )
     return parser.parse_args()
 
 
@@ -141,6 +338,7 @@ def main() -> None:
         meta_path=args.meta_path,
         model_name=args.model_name,
         batch_size=args.batch_size,
+        onnx_model_path=args.onnx_model_path,
     )
 
 
@@ -8,11 +8,12 @@ with deterministic identifiers suitable for embedding and retrieval.
 from __future__ import annotations
 
 import argparse
-import json
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Iterator, List, Sequence
 
+import numpy as np
+import orjson
 
 APP_DIR = Path(__file__).resolve().parent
 DATA_DIR = APP_DIR / "data"
@@ -24,16 +25,35 @@ CHUNKS_JSONL_PATH = DATA_DIR / "symphonic_chunks.jsonl"
 DEFAULT_TARGET_CHARS = 1400
 DEFAULT_MIN_CHARS = 1100
 DEFAULT_OVERLAP_RATIO = 0.15  # 10–15% overlap keeps continuity.
+WRITE_BUFFER_BYTES = 1 << 20
+
+
+PARAGRAPH_SEPARATOR = "\n\n"
 
 
 @dataclass
-class Paragraph:
-    """Normalized PDF paragraph with source page and character offsets."""
+class ParagraphArray:
+    """
+    Normalized PDF paragraphs stored as parallel arrays (struct of arrays).
 
-    page: int
-    text: str
-    start: int
-    end: int
+    ``page``, ``start``, ``end`` and ``length`` are int64 arrays aligned with
+    ``text``. ``joined_end[i]`` is the length of paragraphs ``0..i`` joined with
+    the separator plus one trailing separator, so any window's character count is
+    a difference of two entries.
+    """
+
+    page: np.ndarray
+    text: List[str]
+    start: np.ndarray
+    end: np.ndarray
+    length: np.ndarray
+    joined_end: np.ndarray = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.joined_end = np.cumsum(self.length + len(PARAGRAPH_SEPARATOR))
+
+    def __len__(self) -> int:
+        return len(self.text)
 
 
 @dataclass
@@ -47,8 +67,8 @@ class Chunk:
     start_char: int
     end_char: int
 
-    def to_jsonl(self) -> str:
-        """Serialise the chunk to a JSONL line."""
+    def to_jsonl(self) -> bytes:
+        """Serialise the chunk to a newline-terminated UTF-8 JSONL line."""
         record = {
             "id": self.id,
             "text": self.text,
@@ -57,7 +77,7 @@ class Chunk:
             "start_char": self.start_char,
             "end_char": self.end_char,
         }
-        return json.dumps(record, ensure_ascii=False)
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
 
 
 def _load_pages(path: Path) -> List[dict]:
@@ -68,74 +88,86 @@ def _load_pages(path: Path) -> List[dict]:
             line = line.strip()
             if not line:
                 continue
-            pages.append(json.loads(line))
+            pages.append(orjson.loads(line))
     return pages
 
 
-def _explode_paragraphs(pages: Sequence[dict]) -> List[Paragraph]:
-    """Explode page-level entries into Paragraph objects preserving offsets."""
-    paragraphs: List[Paragraph] = []
-    cursor = 0
-    last_page_index = len(pages) - 1
+def _explode_paragraphs(pages: Sequence[dict]) -> ParagraphArray:
+    """
+    Explode page-level entries into a ParagraphArray preserving offsets.
 
+    Offsets index into the pages joined by blank lines (paragraphs within a page
+    are blank-line separated too, and blank pages still contribute a separator).
+    They are derived with a prefix sum over paragraph lengths plus separators.
+    """
+    page_numbers: List[int] = []
+    page_slots: List[int] = []
+    texts: List[str] = []
     for idx, record in enumerate(pages):
-        page_number = int(record["page"])
         text = record.get("text", "")
         if not text.strip():
-            if idx != last_page_index:
-                cursor += 2  # Account for the inter-page separator.
             continue
-
-        parts = [part.strip() for part in text.split("\n\n") if part.strip()]
-        for part_index, part in enumerate(parts):
-            start = cursor
-            end = start + len(part)
-            paragraphs.append(
-                Paragraph(page=page_number, text=part, start=start, end=end)
-            )
-            cursor = end
-            if part_index != len(parts) - 1:
-                cursor += 2  # Paragraph separator (\n\n).
-
-        if idx != last_page_index:
-            cursor += 2  # Separator between pages.
-
-    return paragraphs
+        page_number = int(record["page"])
+        for part in text.split(PARAGRAPH_SEPARATOR):
+            part = part.strip()
+            if part:
+                page_numbers.append(page_number)
+                page_slots.append(idx)
+                texts.append(part)
+
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    if not texts:
+        empty = np.zeros(0, dtype=np.int64)
+        return ParagraphArray(page=empty, text=[], start=empty, end=empty, length=empty)
+
+    slots = np.asarray(page_slots, dtype=np.int64)
+    # Separator characters preceding each paragraph: one "\n\n" after every earlier
+    # page (blank or not), or a single paragraph break within the same page.
+    page_steps = np.diff(slots, prepend=0)
+    gaps = 2 * np.where(page_steps > 0, page_steps, 1)
+    gaps[0] = 2 * slots[0]
+    ends = np.cumsum(gaps + lengths)
+    return ParagraphArray(
+        page=np.asarray(page_numbers, dtype=np.int64),
+        text=texts,
+        start=ends - lengths,
+        end=ends,
+        length=lengths,
+    )
 
 
 def _collect_window(
-    paragraphs: Sequence[Paragraph],
+    paragraphs: ParagraphArray,
     start_idx: int,
     target_chars: int,
     min_chars: int,
-) -> tuple[List[Paragraph], int, int]:
-    """Collect paragraph windows until the target size (in characters) is reached."""
-    current: List[Paragraph] = []
-    char_count = 0
-    idx = start_idx
-    total = len(paragraphs)
-    while idx < total:
-        para = paragraphs[idx]
-        addition = len(para.text) + (2 if current else 0)
-        anticipated = char_count + addition
-        if current and anticipated > target_chars and char_count >= min_chars:
-            break
-        current.append(para)
-        char_count = anticipated
-        idx += 1
-        if char_count >= target_chars:
-            break
-
-    if not current:
-        current.append(paragraphs[start_idx])
-        char_count = len(current[0].text)
-        idx = min(start_idx + 1, total)
-
-    return current, char_count, idx
+) -> tuple[int, int]:
+    """
+    Collect paragraph windows until the target size (in characters) is reached.
+
+    Returns ``(char_count, end_idx)`` for the window ``start_idx:end_idx``. The
+    window grows until it reaches ``target_chars``; the paragraph that crosses the
+    target is left out if the window already holds ``min_chars`` without it.
+    """
+    joined_end = paragraphs.joined_end
+    # joined_end[j] - offset is the joined size of paragraphs start_idx..j.
+    offset = len(PARAGRAPH_SEPARATOR)
+    if start_idx > 0:
+        offset += int(joined_end[start_idx - 1])
+    cross_idx = int(np.searchsorted(joined_end, target_chars + offset, side="left"))
+    if cross_idx >= len(paragraphs):
+        return int(joined_end[-1]) - offset, len(paragraphs)
+
+    char_count = int(joined_end[cross_idx]) - offset
+    if cross_idx > start_idx and char_count > target_chars:
+        previous_count = int(joined_end[cross_idx - 1]) - offset
+        if previous_count >= min_chars:
+            return previous_count, cross_idx
+    return char_count, cross_idx + 1
 
 
 def _advance_start(
-    paragraphs: Sequence[Paragraph],
+    paragraphs: ParagraphArray,
     start_idx: int,
     end_idx: int,
     char_count: int,
@@ -147,20 +179,21 @@ def _advance_start(
     overlap_chars = int(char_count * overlap_ratio)
     if overlap_chars <= 0:
         return end_idx
-    overlap_limit = paragraphs[end_idx - 1].end - overlap_chars
-    next_start = start_idx
-    while next_start < end_idx and paragraphs[next_start].end <= overlap_limit:
-        next_start += 1
+    overlap_limit = paragraphs.end[end_idx - 1] - overlap_chars
+    # Paragraph ends increase monotonically, so bisecting the shared ``end`` array
+    # counts every paragraph ending at or before the limit. The limit sits below the
+    # window's last end, so the result never reaches ``end_idx``.
+    next_start = int(np.searchsorted(paragraphs.end, overlap_limit, side="right"))
     return next_start if next_start > start_idx else end_idx
 
 
 def _yield_chunks(
-    paragraphs: Sequence[Paragraph],
+    paragraphs: ParagraphArray,
     target_chars: int,
     min_chars: int,
     overlap_ratio: float,
 ) -> Iterator[Chunk]:
-    """Yield chunk definitions using a sliding window over Paragraph instances."""
+    """Yield chunk definitions using a sliding window over the paragraph arrays."""
     if not paragraphs:
         return
 
@@ -169,21 +202,20 @@ def _yield_chunks(
     total_paragraphs = len(paragraphs)
 
     while start_idx < total_paragraphs:
-        window, char_count, next_idx = _collect_window(
+        char_count, next_idx = _collect_window(
             paragraphs, start_idx, target_chars, min_chars
         )
-        text = "\n\n".join(para.text for para in window)
-        page_start = window[0].page
-        page_end = window[-1].page
+        last_idx = next_idx - 1
+        text = PARAGRAPH_SEPARATOR.join(paragraphs.text[start_idx:next_idx])
         chunk_id = f"sym-{chunk_index:06d}"
         chunk_index += 1
         yield Chunk(
             id=chunk_id,
             text=text,
-            page_start=page_start,
-            page_end=page_end,
-            start_char=window[0].start,
-            end_char=window[-1].end,
+            page_start=int(paragraphs.page[start_idx]),
+            page_end=int(paragraphs.page[last_idx]),
+            start_char=int(paragraphs.start[start_idx]),
+            end_char=int(paragraphs.end[last_idx]),
         )
 
         if next_idx >= total_paragraphs:
@@ -209,9 +241,9 @@ def build_chunks(
         return []
     chunks = list(_yield_chunks(paragraphs, target_chars, min_chars, overlap_ratio))
     output_path.parent.mkdir(exist_ok=True)
-    with output_path.open("w", encoding="utf-8") as handle:
+    with output_path.open("wb", buffering=WRITE_BUFFER_BYTES) as handle:
         for chunk in chunks:
-            handle.write(chunk.to_jsonl() + "\n")
+            handle.write(chunk.to_jsonl())
     return chunks
 
 
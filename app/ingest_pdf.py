@@ -14,14 +14,19 @@ Usage (handled by nv-run.sh wrapper in this repo):
 from __future__ import annotations
 
 import argparse
-import json
+import math
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from itertools import repeat
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, List, Optional, Sequence
 
+import orjson
 from pdfminer.high_level import extract_pages
-from pdfminer.layout import LTTextContainer
+from pdfminer.layout import LTPage, LTTextContainer
+from pdfminer.pdfpage import PDFPage
 
 
 APP_DIR = Path(__file__).resolve().parent
@@ -31,6 +36,11 @@ INGEST_DIR = APP_DIR / "ingest"
 PDF_FILENAME = "symphonic-promptingc.pdf"
 RAW_TEXT_PATH = DATA_DIR / "symphonic_raw.txt"
 PAGES_JSONL_PATH = DATA_DIR / "symphonic_pages.jsonl"
+WRITE_BUFFER_BYTES = 1 << 20
+
+HYPHEN_BREAK_RE = re.compile(r"(\w+)-\s*\n\s*(\w+)")
+PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n")
+WHITESPACE_RUN_RE = re.compile(r"\s{2,}")
 
 
 @dataclass
@@ -40,22 +50,55 @@ class PageRecord:
     page_number: int
     text: str
 
-    def to_jsonl(self) -> str:
-        """Return the JSONL line for this page."""
+    def to_jsonl(self) -> bytes:
+        """Return the newline-terminated UTF-8 JSONL line for this page."""
         record = {"page": self.page_number, "text": self.text}
-        return json.dumps(record, ensure_ascii=False)
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+
+
+def _page_text(page_layout: LTPage) -> str:
+    """Concatenate the text containers of a laid-out page."""
+    fragments: List[str] = []
+    for element in page_layout:
+        if isinstance(element, LTTextContainer):
+            fragments.append(element.get_text())
+    return "".join(fragments)
+
 
+def _extract_page_range(pdf_path: Path, page_numbers: Sequence[int]) -> List[str]:
+    """Extract raw text for the given zero-based page numbers, in order."""
+    return [
+        _page_text(page_layout)
+        for page_layout in extract_pages(pdf_path, page_numbers=page_numbers)
+    ]
 
-def _extract_page_strings(pdf_path: Path) -> List[str]:
-    """Extract raw text (with layout artifacts) for each page in the PDF."""
-    pages: List[str] = []
-    for page_layout in extract_pages(pdf_path):
-        fragments: List[str] = []
-        for element in page_layout:
-            if isinstance(element, LTTextContainer):
-                fragments.append(element.get_text())
-        pages.append("".join(fragments))
-    return pages
+
+def _count_pages(pdf_path: Path) -> int:
+    """Return the number of pages in the PDF without laying them out."""
+    with pdf_path.open("rb") as handle:
+        return sum(1 for _ in PDFPage.get_pages(handle))
+
+
+def _extract_page_strings(pdf_path: Path, workers: Optional[int] = None) -> List[str]:
+    """
+    Extract raw text (with layout artifacts) for each page in the PDF.
+
+    Layout analysis is CPU-bound pure Python, so pages are split into contiguous
+    ranges and laid out in a process pool (``workers`` defaults to the CPU count).
+    """
+    page_count = _count_pages(pdf_path)
+    workers = min(workers or os.cpu_count() or 1, page_count)
+    if workers <= 1:
+        return _extract_page_range(pdf_path, range(page_count))
+
+    step = math.ceil(page_count / workers)
+    page_ranges = [
+        range(first, min(first + step, page_count))
+        for first in range(0, page_count, step)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_extract_page_range, repeat(pdf_path), page_ranges)
+        return [page for page_range in results for page in page_range]
 
 
 def _rehyphenate(text: str) -> str:
@@ -64,7 +107,7 @@ def _rehyphenate(text: str) -> str:
     def _merge(match: re.Match[str]) -> str:
         return f"{match.group(1)}{match.group(2)}"
 
-    return re.sub(r"(\w+)-\s*\n\s*(\w+)", _merge, text)
+    return HYPHEN_BREAK_RE.sub(_merge, text)
 
 
 def _normalize_whitespace(raw_text: str) -> str:
@@ -78,7 +121,7 @@ def _normalize_whitespace(raw_text: str) -> str:
     text = raw_text.replace("\r\n", "\n").replace("\r", "\n")
     text = _rehyphenate(text)
     # Split paragraphs on blank lines and rebuild with normalized spacing.
-    blocks = re.split(r"\n\s*\n", text)
+    blocks = PARAGRAPH_SPLIT_RE.split(text)
     paragraphs: List[str] = []
     for block in blocks:
         stripped = block.strip()
@@ -88,14 +131,14 @@ def _normalize_whitespace(raw_text: str) -> str:
         lines = [line.strip() for line in stripped.splitlines() if line.strip()]
         if not lines:
             continue
-        paragraph = re.sub(r"\s{2,}", " ", " ".join(lines))
+        paragraph = WHITESPACE_RUN_RE.sub(" ", " ".join(lines))
         paragraphs.append(paragraph)
     return "\n\n".join(paragraphs)
 
 
-def build_page_records(pdf_path: Path) -> List[PageRecord]:
+def build_page_records(pdf_path: Path, workers: Optional[int] = None) -> List[PageRecord]:
     """Extract and normalize each page of the PDF into structured records."""
-    raw_pages = _extract_page_strings(pdf_path)
+    raw_pages = _extract_page_strings(pdf_path, workers=workers)
     records: List[PageRecord] = []
     for index, raw_text in enumerate(raw_pages, start=1):
         normalized = _normalize_whitespace(raw_text)
@@ -110,10 +153,11 @@ def write_artifacts(records: Iterable[PageRecord]) -> None:
     pages: List[PageRecord] = list(records)
     raw_doc = "\n\n".join(record.text for record in pages if record.text)
 
-    RAW_TEXT_PATH.write_text(raw_doc, encoding="utf-8")
-    with PAGES_JSONL_PATH.open("w", encoding="utf-8") as jsonl_file:
+    with RAW_TEXT_PATH.open("wb", buffering=WRITE_BUFFER_BYTES) as raw_file:
+        raw_file.write(raw_doc.encode("utf-8"))
+    with PAGES_JSONL_PATH.open("wb", buffering=WRITE_BUFFER_BYTES) as jsonl_file:
         for record in pages:
-            jsonl_file.write(record.to_jsonl() + "\n")
+            jsonl_file.write(record.to_jsonl())
 
 
 def parse_args() -> argparse.Namespace:
@@ -126,6 +170,12 @@ def parse_args() -> argparse.Namespace:
         default=INGEST_DIR / PDF_FILENAME,
         help="Path to the source PDF (defaults to the bundled symphonic-promptingc.pdf).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes used for page layout analysis (defaults to the CPU count).",
+    )
     return parser.parse_args()
 
 
@@ -134,7 +184,7 @@ def main() -> None:
     pdf_path: Path = args.pdf_path
     if not pdf_path.exists():
         raise FileNotFoundError(f"Missing PDF at {pdf_path}")
-    records = build_page_records(pdf_path)
+    records = build_page_records(pdf_path, workers=args.workers)
     write_artifacts(records)
 
 
@@ -2,22 +2,29 @@
 Search utilities for the Symphonic Prompting corpus.
 
 `search` is the primary entrypoint. It returns a list of dictionaries with the
-top retrieval hits for a query. The module also exposes a CLI that prints
-formatted JSON to stdout.
+top retrieval hits for a query; `search_async` is the same pipeline for event
+loops, with model inference and FAISS scans dispatched to dedicated thread pools.
+The module also exposes a CLI that prints formatted JSON to stdout.
 """
 
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 import logging
+import mmap
+import os
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import faiss
 import numpy as np
+import orjson
 import torch
 from sentence_transformers import SentenceTransformer
 
@@ -25,6 +32,7 @@ from sentence_transformers import SentenceTransformer
 APP_DIR = Path(__file__).resolve().parent
 DATA_DIR = APP_DIR / "data"
 INDEX_DIR = APP_DIR / "index"
+ONNX_EXPORT_DIR = APP_DIR / "models" / "onnx"
 
 CHUNKS_JSONL_PATH = DATA_DIR / "symphonic_chunks.jsonl"
 IDS_PATH = INDEX_DIR / "ids.json"
@@ -34,10 +42,110 @@ EMBED_MODEL_NAME = "intfloat/e5-large-v2"
 RERANK_MODEL_NAME = "BAAI/bge-reranker-base"
 DEFAULT_TOP_K = 5
 DEFAULT_CANDIDATES = 50
+# Passages sent to the cross-encoder per query (never fewer than top_k); the FAISS
+# ordering beyond this depth rarely survives reranking, but each pair costs a forward.
+RERANK_LIMIT = int(os.environ.get("SYMPHONIC_RERANK_LIMIT", "20"))
 PREVIEW_CHARS = 240
+# e5-style instruction prefixes shared by the encoder and reranker inputs.
+QUERY_PREFIX = "query: "
+PASSAGE_PREFIX = "passage: "
+QUERY_EMBED_CACHE_SIZE = 1024
+RERANK_BATCH_SIZE = 32
+# Token budget per cached passage, leaving room for the query and special tokens.
+RERANK_PASSAGE_TOKENS = 480
+# Graph-optimised (fused LayerNorm/GELU/attention) exports used for CPU inference.
+EMBED_ONNX_FILE = "onnx/model_O3.onnx"
+RERANK_ONNX_FILE = "onnx/model_O3.onnx"
+# Dynamic int8 reranker weights (VNNI dot-products); set SYMPHONIC_RERANK_FP32=1 to
+# keep the FP32 graph when bit-for-bit scores matter more than throughput.
+RERANK_QUANTIZED_ONNX_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+RERANK_FP32 = os.environ.get("SYMPHONIC_RERANK_FP32", "0") == "1"
+
+# Containers often report a single default intra-op thread; size it explicitly.
+TORCH_THREADS = int(os.environ.get("SYMPHONIC_TORCH_THREADS", os.cpu_count() or 4))
+# Flat inner-product scans stop scaling past ~8 OpenMP threads.
+FAISS_MAX_THREADS = 8
+# HNSW beam width at query time (matches build_index); ample for 50 candidates.
+HNSW_EF_SEARCH = 64
 
 LOGGER = logging.getLogger(__name__)
 
+faiss.omp_set_num_threads(min(FAISS_MAX_THREADS, os.cpu_count() or 1))
+torch.set_num_threads(TORCH_THREADS)
+try:
+    torch.set_num_interop_threads(1)
+except RuntimeError:  # pragma: no cover - already fixed once parallel work has run
+    pass
+# Retrieval never trains; grad mode is per-thread, so encode() also uses inference_mode.
+torch.set_grad_enabled(False)
+
+# Encoder/reranker calls already fan out across intra-op threads (or own the GPU), so
+# they run one at a time. Single-query FAISS scans are single-threaded and release
+# the GIL, so several can overlap with each other and with inference.
+ENCODE_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="encode")
+FAISS_POOL = ThreadPoolExecutor(
+    max_workers=min(FAISS_MAX_THREADS, os.cpu_count() or 1), thread_name_prefix="faiss"
+)
+
+
+def _onnx_model_kwargs(file_name: str) -> Dict[str, Any]:
+    """ONNX Runtime options for CPU inference: full graph optimisation, all cores."""
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    options.intra_op_num_threads = os.cpu_count() or 1
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return {
+        "file_name": file_name,
+        "provider": "CPUExecutionProvider",
+        "session_options": options,
+    }
+
+
+def _export_optimized(model: Any, export_dir: Path) -> None:
+    """Write the O3-optimised ONNX graph for ``model`` into ``export_dir``."""
+    from sentence_transformers.backend import export_optimized_onnx_model
+
+    export_optimized_onnx_model(model, "O3", str(export_dir))
+
+
+def _export_quantized(model: Any, export_dir: Path) -> None:
+    """Write the dynamically int8-quantised ONNX graph for ``model``."""
+    from sentence_transformers.backend import export_dynamic_quantized_onnx_model
+
+    export_dynamic_quantized_onnx_model(model, "avx512_vnni", str(export_dir))
+
+
+def _load_onnx_model(
+    model_cls: Callable[..., Any],
+    model_name: str,
+    file_name: str,
+    export: Callable[[Any, Path], None] = _export_optimized,
+) -> Any:
+    """
+    Load ``model_name`` on the ONNX backend from an export cached under app/models/.
+
+    The first call exports the model to ONNX, saves it locally, and lets ``export``
+    write ``file_name``; later loads open the saved graph directly.
+    """
+    export_dir = ONNX_EXPORT_DIR / model_name.replace("/", "--")
+    if not (export_dir / file_name).exists():
+        model = model_cls(model_name, backend="onnx")
+        model.save_pretrained(str(export_dir))
+        export(model, export_dir)
+    return model_cls(
+        str(export_dir), backend="onnx", model_kwargs=_onnx_model_kwargs(file_name)
+    )
+
+
+def _iter_mapped_lines(path: Path) -> Iterator[bytes]:
+    """Yield the lines of ``path`` read straight from a read-only memory map."""
+    with path.open("rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return  # mmap cannot map an empty file
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from iter(mapped.readline, b"")
+
 
 @dataclass
 class ChunkRecord:
@@ -47,6 +155,52 @@ class ChunkRecord:
     page_end: int
     start_char: int
     end_char: int
+    preview: str
+
+
+@dataclass
+class ChunkColumns:
+    """
+    Chunk records in FAISS vector order stored as parallel arrays (struct of arrays).
+
+    ``id``, ``text`` and ``preview`` are object arrays of str; the offsets are int64
+    arrays, so candidate assembly is a fancy-index gather per column.
+    """
+
+    id: np.ndarray
+    text: np.ndarray
+    preview: np.ndarray
+    page_start: np.ndarray
+    page_end: np.ndarray
+    start_char: np.ndarray
+    end_char: np.ndarray
+
+    @classmethod
+    def from_records(cls, records: Sequence[ChunkRecord]) -> "ChunkColumns":
+        """Pack ``records`` column-wise."""
+        count = len(records)
+
+        def strings(values: List[str]) -> np.ndarray:
+            column = np.empty(count, dtype=object)
+            column[:] = values
+            return column
+
+        def ints(field_name: str) -> np.ndarray:
+            values = (getattr(record, field_name) for record in records)
+            return np.fromiter(values, dtype=np.int64, count=count)
+
+        return cls(
+            id=strings([record.id for record in records]),
+            text=strings([record.text for record in records]),
+            preview=strings([record.preview for record in records]),
+            page_start=ints("page_start"),
+            page_end=ints("page_end"),
+            start_char=ints("start_char"),
+            end_char=ints("end_char"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.id)
 
 
 class ArtifactStore:
@@ -67,9 +221,15 @@ class ArtifactStore:
         self._lock = threading.Lock()
         self._chunk_lookup: Optional[Dict[str, ChunkRecord]] = None
         self._ordered_chunks: Optional[List[ChunkRecord]] = None
+        self._chunk_columns: Optional[ChunkColumns] = None
         self._ids: Optional[List[str]] = None
-        self._index: Optional[faiss.IndexFlatIP] = None
+        self._index: Optional[faiss.Index] = None
         self._model: Optional[SentenceTransformer] = None
+        # Per-thread (1, k) score/label buffers reused across index searches.
+        self._search_buffers = threading.local()
+        # LRU of raw float32 query embeddings, shared by single and batched encodes.
+        self._embed_cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._embed_cache_lock = threading.Lock()
 
     def is_ready(self) -> bool:
         """Return True when the embeddings, ids, and FAISS index exist."""
@@ -85,21 +245,21 @@ class ArtifactStore:
             return
 
         chunk_lookup: Dict[str, ChunkRecord] = {}
-        with self.chunks_path.open("r", encoding="utf-8") as handle:
-            for line in handle:
-                line = line.strip()
-                if not line:
-                    continue
-                payload = json.loads(line)
-                record = ChunkRecord(
-                    id=payload["id"],
-                    text=payload["text"],
-                    page_start=int(payload["page_start"]),
-                    page_end=int(payload["page_end"]),
-                    start_char=int(payload["start_char"]),
-                    end_char=int(payload["end_char"]),
-                )
-                chunk_lookup[record.id] = record
+        for line in _iter_mapped_lines(self.chunks_path):
+            if not line.strip():
+                continue
+            payload = orjson.loads(line)
+            text = payload["text"]
+            record = ChunkRecord(
+                payload["id"],
+                text,
+                payload["page_start"],
+                payload["page_end"],
+                payload["start_char"],
+                payload["end_char"],
+                text[:PREVIEW_CHARS].strip().replace("\n", " "),
+            )
+            chunk_lookup[record.id] = record
 
         self._chunk_lookup = chunk_lookup
 
@@ -107,16 +267,27 @@ class ArtifactStore:
         """Load the on-disk list of chunk ids in index order."""
         if self._ids is not None:
             return
-        ids = json.loads(self.ids_path.read_text(encoding="utf-8"))
+        ids = orjson.loads(self.ids_path.read_bytes())
         self._ids = ids
 
     def _ensure_index(self) -> None:
-        """Load the FAISS index into memory if needed."""
+        """
+        Load the FAISS index from disk if needed.
+
+        ``IO_FLAG_MMAP`` only maps IVF inverted lists, so pages are shared across
+        workers for the IVF-PQ index alone; an HNSW index is read into each process.
+        """
         if self._index is not None:
             return
-        index = faiss.read_index(str(self.faiss_path))
-        if not isinstance(index, faiss.IndexFlatIP):
-            raise TypeError("Expected IndexFlatIP for Symphonic Prompting retrieval.")
+        index = faiss.read_index(
+            str(self.faiss_path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+        )
+        if index.metric_type != faiss.METRIC_INNER_PRODUCT:
+            raise TypeError(
+                "Expected an inner-product index for Symphonic Prompting retrieval."
+            )
+        if isinstance(index, faiss.IndexHNSW):
+            index.hnsw.efSearch = max(HNSW_EF_SEARCH, DEFAULT_CANDIDATES)
         self._index = index
 
     def _ensure_ordered_chunks(self) -> None:
@@ -133,17 +304,30 @@ class ArtifactStore:
             if record is None:
                 raise KeyError(f"Chunk id {chunk_id} missing from chunk metadata.")
             ordered.append(record)
+        self._chunk_columns = ChunkColumns.from_records(ordered)
         self._ordered_chunks = ordered
 
     def _ensure_model(self) -> None:
-        """Load the embedding model used for query encoding."""
+        """Load the embedding model (PyTorch on CUDA, ONNX Runtime on CPU)."""
         if self._model is not None:
             return
-        self._model = SentenceTransformer(self.embed_model_name)
+        if torch.cuda.is_available():
+            self._model = SentenceTransformer(self.embed_model_name)
+            return
+        try:
+            self._model = _load_onnx_model(
+                SentenceTransformer, self.embed_model_name, EMBED_ONNX_FILE
+            )
+        except Exception as exc:  # pragma: no cover - optional ONNX dependencies
+            LOGGER.warning("Falling back to PyTorch embedding model: %s", exc)
+            self._model = SentenceTransformer(self.embed_model_name)
 
     @property
-    def index(self) -> faiss.IndexFlatIP:
+    def index(self) -> faiss.Index:
         """Return the FAISS index, loading it lazily if necessary."""
+        index = self._index
+        if index is not None:
+            return index
         with self._lock:
             self._ensure_index()
             assert self._index is not None
@@ -152,29 +336,137 @@ class ArtifactStore:
     @property
     def ordered_chunks(self) -> Sequence[ChunkRecord]:
         """Return chunk records sorted to align with FAISS vector storage."""
+        ordered_chunks = self._ordered_chunks
+        if ordered_chunks is not None:
+            return ordered_chunks
         with self._lock:
             self._ensure_ordered_chunks()
             assert self._ordered_chunks is not None
             return self._ordered_chunks
 
+    @property
+    def chunk_columns(self) -> ChunkColumns:
+        """Return the ordered chunk records as parallel column arrays."""
+        chunk_columns = self._chunk_columns
+        if chunk_columns is not None:
+            return chunk_columns
+        with self._lock:
+            self._ensure_ordered_chunks()
+            assert self._chunk_columns is not None
+            return self._chunk_columns
+
     @property
     def model(self) -> SentenceTransformer:
         """Return the embedding model instance."""
+        model = self._model
+        if model is not None:
+            return model
         with self._lock:
             self._ensure_model()
             assert self._model is not None
             return self._model
 
-    def encode_query(self, query: str) -> np.ndarray:
-        """Encode a natural-language query into the shared embedding space."""
+    def cached_query_embedding(self, query: str) -> Optional[np.ndarray]:
+        """Return the cached read-only ``(1, d)`` embedding for ``query``, or None."""
+        with self._embed_cache_lock:
+            embedding = self._embed_cache.get(query)
+            if embedding is None:
+                return None
+            self._embed_cache.move_to_end(query)
+        return np.frombuffer(embedding, dtype=np.float32).reshape(1, -1)
+
+    def _remember_query_embeddings(
+        self, queries: Sequence[str], embeddings: np.ndarray
+    ) -> None:
+        """Add freshly encoded rows to the LRU, evicting the least recently used."""
+        with self._embed_cache_lock:
+            for query, row in zip(queries, embeddings):
+                self._embed_cache[query] = row.tobytes()
+                self._embed_cache.move_to_end(query)
+            while len(self._embed_cache) > QUERY_EMBED_CACHE_SIZE:
+                self._embed_cache.popitem(last=False)
+
+    def encode_queries(self, queries: Sequence[str]) -> np.ndarray:
+        """
+        Encode several queries; returns one row per query.
+
+        Queries already in the embedding LRU skip the encoder; the distinct misses are
+        encoded in one forward pass and written back to the LRU.
+        """
+        rows = {query: self.cached_query_embedding(query) for query in queries}
+        misses = [query for query, row in rows.items() if row is None]
+        if not misses:
+            return np.concatenate([rows[query] for query in queries])
+        encoded = self._encode_uncached(misses)
+        self._remember_query_embeddings(misses, encoded)
+        if len(misses) == len(queries):
+            return encoded
+        rows.update(
+            (query, encoded[pos].reshape(1, -1)) for pos, query in enumerate(misses)
+        )
+        return np.concatenate([rows[query] for query in queries])
+
+    def _encode_uncached(self, queries: Sequence[str]) -> np.ndarray:
+        """Encode ``queries`` in one forward pass into unit-norm float32 rows."""
         model = self.model
-        embedding = model.encode(
-            [f"query: {query}"],
-            convert_to_numpy=True,
-            normalize_embeddings=True,
-            show_progress_bar=False,
-        )[0]
-        return embedding.astype("float32")
+        with torch.inference_mode():
+            embeddings = model.encode(
+                [QUERY_PREFIX + query for query in queries],
+                batch_size=len(queries),
+                convert_to_numpy=True,
+                normalize_embeddings=False,
+                show_progress_bar=False,
+            )
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        # Normalise in place on the output buffer rather than as an extra torch op.
+        faiss.normalize_L2(embeddings)
+        return embeddings
+
+    def warmup(self) -> None:
+        """
+        Eagerly load the index, chunk metadata, and embedding model.
+
+        A throwaway query is encoded and searched so encoder thread pools (or CUDA
+        kernels) and the FAISS thread team are initialised before the first request.
+        """
+        index = self.index
+        self.ordered_chunks
+        query_vector = self.encode_query("warmup")
+        if index.ntotal:
+            self.search_index(query_vector, min(DEFAULT_CANDIDATES, index.ntotal))
+
+    def search_index(
+        self, query_vector: np.ndarray, k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search the index for one ``(1, d)`` query into reusable output buffers.
+
+        The returned ``(1, k)`` score and label arrays belong to the calling thread and
+        are overwritten by its next search, so consume them before searching again.
+        """
+        index = self.index
+        buffers = self._search_buffers
+        capacity = getattr(buffers, "capacity", 0)
+        if capacity < k:
+            capacity = max(k, DEFAULT_CANDIDATES)
+            buffers.scores = np.empty((1, capacity), dtype=np.float32)
+            buffers.labels = np.empty((1, capacity), dtype=np.int64)
+            buffers.capacity = capacity
+        return index.search(
+            query_vector, k, D=buffers.scores[:, :k], I=buffers.labels[:, :k]
+        )
+
+    def encode_query(self, query: str) -> np.ndarray:
+        """
+        Encode a natural-language query as a ``(1, d)`` float32 FAISS query matrix.
+
+        Repeated queries are served from the embedding LRU (as a read-only view over
+        the cached buffer) without running the encoder.
+        """
+        cached = self.cached_query_embedding(query)
+        if cached is not None:
+            return cached
+        return self.encode_queries([query])
 
 
 class OptionalReranker:
@@ -185,12 +477,76 @@ class OptionalReranker:
         self._model = None
         self._load_failure: Optional[Exception] = None
         self._lock = threading.Lock()
+        # Prefixed passage token ids (no special tokens), one dict per corpus (keyed by
+        # the store's chunks path) because chunk ids repeat across corpora.
+        self._passage_ids: Dict[Path, Dict[str, List[int]]] = {}
 
     def is_available(self) -> bool:
         """Return True when the cross-encoder model is loaded."""
         model = self._get_model()
         return model is not None
 
+    def preload(self, store: Optional[ArtifactStore] = None) -> threading.Thread:
+        """
+        Start loading the cross-encoder on a background daemon thread.
+
+        When ``store`` is given, its whole chunk corpus is tokenized afterwards so
+        queries only tokenize their own text.
+        """
+
+        def load() -> None:
+            model = self._get_model()
+            if model is not None and store is not None:
+                columns = store.chunk_columns
+                self._tokenize_passages(
+                    model,
+                    self._corpus_passage_ids(store),
+                    columns.id.tolist(),
+                    columns.text.tolist(),
+                )
+
+        thread = threading.Thread(target=load, name="reranker-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def _corpus_passage_ids(self, store: ArtifactStore) -> Dict[str, List[int]]:
+        """Return the passage token-id cache for ``store``'s corpus."""
+        return self._passage_ids.setdefault(store.chunks_path, {})
+
+    @staticmethod
+    def _tokenize_passages(
+        model: Any,
+        passage_ids: Dict[str, List[int]],
+        chunk_ids: Sequence[str],
+        texts: Sequence[str],
+    ) -> None:
+        """Tokenize prefixed passages into ``passage_ids``, keyed by chunk id."""
+        passages = [PASSAGE_PREFIX + text for text in texts]
+        encoded = model.tokenizer(
+            passages,
+            add_special_tokens=False,
+            truncation=True,
+            max_length=RERANK_PASSAGE_TOKENS,
+        )["input_ids"]
+        passage_ids.update(zip(chunk_ids, encoded))
+
+    def _load_cpu_model(self, cross_encoder_cls: Callable[..., Any]) -> Any:
+        """Load the cross-encoder on the ONNX backend, else PyTorch on CPU."""
+        try:
+            if RERANK_FP32:
+                return _load_onnx_model(
+                    cross_encoder_cls, self.model_name, RERANK_ONNX_FILE
+                )
+            return _load_onnx_model(
+                cross_encoder_cls,
+                self.model_name,
+                RERANK_QUANTIZED_ONNX_FILE,
+                export=_export_quantized,
+            )
+        except Exception as exc:  # pragma: no cover - optional ONNX dependencies
+            LOGGER.warning("Falling back to PyTorch CrossEncoder: %s", exc)
+            return cross_encoder_cls(self.model_name, device="cpu")
+
     def _get_model(self):
         """Load and cache the cross-encoder model if possible."""
         if self._model is not None:
@@ -207,16 +563,18 @@ class OptionalReranker:
 
                 target_device = "cuda" if torch.cuda.is_available() else "cpu"
                 try:
-                    self._model = CrossEncoder(self.model_name, device=target_device)
                     if target_device == "cuda":
+                        self._model = CrossEncoder(self.model_name, device=target_device)
                         LOGGER.info("CrossEncoder loaded on CUDA device for reranking.")
+                    else:
+                        self._model = self._load_cpu_model(CrossEncoder)
                 except RuntimeError as runtime_exc:
                     if target_device == "cuda" and "CUDA" in str(runtime_exc):
                         LOGGER.warning(
                             "Falling back to CPU CrossEncoder due to CUDA error: %s",
                             runtime_exc,
                         )
-                        self._model = CrossEncoder(self.model_name, device="cpu")
+                        self._model = self._load_cpu_model(CrossEncoder)
                     else:  # pragma: no cover - unexpected device error
                         raise
             except (
@@ -226,59 +584,125 @@ class OptionalReranker:
                 self._model = None
         return self._model
 
-    def rerank(self, query: str, candidates: Sequence[dict], top_k: int) -> List[dict]:
-        """Rerank FAISS candidates with the cross-encoder, falling back gracefully."""
+    def rerank(
+        self,
+        query: str,
+        candidates: Sequence[dict],
+        top_k: int,
+        store: Optional[ArtifactStore] = None,
+    ) -> List[dict]:
+        """
+        Rerank FAISS candidates with the cross-encoder, falling back gracefully.
+
+        Passage token ids are cached per ``store`` corpus; without a store the
+        candidates are tokenized for this call only.
+        """
         model = self._get_model()
         if model is None:
             return list(candidates)[:top_k]
+        if not candidates:
+            return []
+
+        # Passages come pre-tokenized from the corpus cache, so only the query is
+        # tokenized here; pairs are then assembled at the input-id level and
+        # truncated to the model's token window.
+        corpus_ids = self._corpus_passage_ids(store) if store is not None else {}
+        missing = [entry for entry in candidates if entry["id"] not in corpus_ids]
+        if missing:
+            self._tokenize_passages(
+                model,
+                corpus_ids,
+                [entry["id"] for entry in missing],
+                [entry["text"] for entry in missing],
+            )
+        tokenizer = model.tokenizer
+        query_ids = tokenizer(QUERY_PREFIX + query, add_special_tokens=False)["input_ids"]
+        passage_ids = [corpus_ids[entry["id"]] for entry in candidates]
+
+        # Score pairs shortest-first so each batch pads to similar lengths.
+        order = np.argsort([len(ids) for ids in passage_ids], kind="stable")
+        scores = np.empty(len(order), dtype=np.float32)
+        with torch.inference_mode():
+            for start in range(0, len(order), RERANK_BATCH_SIZE):
+                stop = start + RERANK_BATCH_SIZE
+                batch = order[start:stop]
+                features = tokenizer.pad(
+                    [
+                        tokenizer.prepare_for_model(
+                            query_ids,
+                            passage_ids[idx],
+                            truncation=True,
+                            max_length=model.max_length,
+                        )
+                        for idx in batch.tolist()
+                    ],
+                    return_tensors="pt",
+                ).to(model.model.device)
+                logits = model.activation_fn(
+                    model.model(**features, return_dict=True).logits
+                )
+                scores[batch] = logits[:, 0].float().cpu().numpy()
 
-        pairs = [(f"query: {query}", f"passage: {entry['text']}") for entry in candidates]
-        scores = model.predict(pairs)
-        scored = []
-        for entry, score in zip(candidates, scores):
-            scored.append({**entry, "score": float(score)})
-        scored.sort(key=lambda item: item["score"], reverse=True)
-        return scored[:top_k]
+        # Partial top-k selection. Ties at the k-th score keep FAISS candidate order,
+        # matching a stable descending sort.
+        k = min(top_k, len(scores))
+        kth_score = np.partition(scores, -k)[-k]
+        above = np.flatnonzero(scores > kth_score)
+        ties = np.flatnonzero(scores == kth_score)[: k - len(above)]
+        top_idx = np.concatenate((above, ties))
+        top_idx = top_idx[np.lexsort((top_idx, -scores[top_idx]))]
+        return [
+            {**candidates[idx], "score": float(scores[idx])} for idx in top_idx.tolist()
+        ]
 
 
 ARTIFACT_STORE = ArtifactStore()
 RERANKER = OptionalReranker()
 
 
-def _make_candidates(
-    indices: Sequence[int], scores: Sequence[float], store: ArtifactStore
-) -> List[dict]:
-    """Construct candidate dictionaries from FAISS indices and scores."""
-    ordered_chunks = store.ordered_chunks
-    candidates: List[dict] = []
-    for rank, (idx, score) in enumerate(zip(indices, scores)):
-        if idx < 0 or idx >= len(ordered_chunks):
-            continue
-        chunk = ordered_chunks[idx]
-        preview = chunk.text[:PREVIEW_CHARS].strip().replace("\n", " ")
-        candidate = {
-            "id": chunk.id,
-            "score": float(score),
-            "page_start": chunk.page_start,
-            "page_end": chunk.page_end,
-            "start_char": chunk.start_char,
-            "end_char": chunk.end_char,
-            "preview": preview,
-            # Retain text internally for optional reranker.
-            "text": chunk.text,
-            "rank": rank,
-        }
-        candidates.append(candidate)
-    return candidates
+def warmup(store: ArtifactStore = ARTIFACT_STORE) -> ArtifactStore:
+    """Warm ``store`` while the reranker loads concurrently in the background."""
+    RERANKER.preload(store)
+    store.warmup()
+    return store
 
 
-def search(
-    query: str,
-    top_k: int = DEFAULT_TOP_K,
-    rerank: bool = True,
-    store: ArtifactStore = ARTIFACT_STORE,
+def _make_candidates(
+    indices: Sequence[int],
+    scores: Sequence[float],
+    store: ArtifactStore,
+    include_text: bool = True,
 ) -> List[dict]:
-    """Retrieve semantic matches for ``query`` using FAISS and optional reranking."""
+    """
+    Construct candidate dictionaries from FAISS indices and scores.
+
+    Out-of-range labels (FAISS pads with -1) are dropped by one vectorised mask and
+    each field is gathered column-wise from ``store.chunk_columns``. Full chunk text
+    is only attached when ``include_text`` is set (i.e. for the reranker).
+    """
+    indices = np.asarray(indices)
+    scores = np.asarray(scores)
+    columns = store.chunk_columns
+    valid = (indices >= 0) & (indices < len(columns))
+    rows = indices[valid]
+    fields = {
+        "id": columns.id[rows].tolist(),
+        "score": scores[valid].tolist(),
+        "page_start": columns.page_start[rows].tolist(),
+        "page_end": columns.page_end[rows].tolist(),
+        "start_char": columns.start_char[rows].tolist(),
+        "end_char": columns.end_char[rows].tolist(),
+        "preview": columns.preview[rows].tolist(),
+    }
+    if include_text:
+        # Retain text internally for optional reranker.
+        fields["text"] = columns.text[rows].tolist()
+    names = tuple(fields)
+    return [dict(zip(names, values)) for values in zip(*fields.values())]
+
+
+def _check_searchable(top_k: int, store: ArtifactStore) -> None:
+    """Validate ``top_k`` and ensure the on-disk artifacts exist."""
     if top_k <= 0:
         raise ValueError("top_k must be positive.")
     if not store.is_ready():
@@ -286,41 +710,102 @@ def search(
             "Retrieval artifacts missing. Run ingestion, chunking, and index build first."
         )
 
-    query_vector = store.encode_query(query)
+
+def _candidate_count(top_k: int, rerank: bool, rerank_limit: Optional[int]) -> int:
+    """
+    Number of FAISS hits to fetch: ``top_k`` without reranking, otherwise the rerank
+    depth (``rerank_limit``, or ``DEFAULT_CANDIDATES`` when uncapped).
+    """
+    if not rerank:
+        return top_k
+    if rerank_limit is None:
+        return max(top_k, DEFAULT_CANDIDATES)
+    return max(top_k, rerank_limit)
+
+
+def _retrieve_candidates(
+    query_vector: np.ndarray,
+    top_k: int,
+    rerank: bool,
+    store: ArtifactStore,
+    rerank_limit: Optional[int] = RERANK_LIMIT,
+) -> List[dict]:
+    """Run the FAISS scan for ``query_vector`` and assemble the candidate dicts."""
     index = store.index
-    candidate_count = min(max(top_k, DEFAULT_CANDIDATES), index.ntotal)
+    candidate_count = min(_candidate_count(top_k, rerank, rerank_limit), index.ntotal)
     if candidate_count == 0:
         return []
 
-    scores, indices = index.search(np.array([query_vector]), candidate_count)
-    candidates = _make_candidates(indices[0], scores[0], store)
+    # A (d,) row reshapes to (1, d) as a view, so FAISS reads the caller's buffer.
+    scores, indices = store.search_index(query_vector.reshape(1, -1), candidate_count)
+    return _make_candidates(indices[0], scores[0], store, include_text=rerank)
+
+
+def _finalize_results(
+    query: str, candidates: List[dict], top_k: int, rerank: bool, store: ArtifactStore
+) -> List[dict]:
+    """Keep the best ``top_k`` candidates (reranked if requested) in result shape."""
+    if not rerank:
+        # Built without internal fields, so the slice is already the response.
+        return candidates[:top_k]
+    candidates = RERANKER.rerank(query, candidates, top_k, store)
+    # Drop the reranker-only text in place before returning.
+    for entry in candidates:
+        entry.pop("text", None)
+    return candidates
+
+
+def search(
+    query: str,
+    top_k: int = DEFAULT_TOP_K,
+    rerank: bool = True,
+    store: ArtifactStore = ARTIFACT_STORE,
+    query_vector: Optional[np.ndarray] = None,
+    rerank_limit: Optional[int] = RERANK_LIMIT,
+) -> List[dict]:
+    """
+    Retrieve semantic matches for ``query`` using FAISS and optional reranking.
+
+    ``query_vector`` lets callers that already embedded ``query`` skip the encoder;
+    either a ``(d,)`` row or a ``(1, d)`` matrix of contiguous float32 is accepted.
+    ``rerank_limit`` caps how many FAISS hits the cross-encoder scores (``None``
+    reranks all ``DEFAULT_CANDIDATES``); without reranking only ``top_k`` are fetched.
+    """
+    _check_searchable(top_k, store)
+    if query_vector is None:
+        query_vector = store.encode_query(query)
+    candidates = _retrieve_candidates(query_vector, top_k, rerank, store, rerank_limit)
     if not candidates:
         return []
+    return _finalize_results(query, candidates, top_k, rerank, store)
 
-    if rerank:
-        candidates = RERANKER.rerank(query, candidates, top_k)
-        for rank, entry in enumerate(candidates):
-            entry["rank"] = rank
-    else:
-        candidates = candidates[:top_k]
-        for rank, entry in enumerate(candidates):
-            entry["rank"] = rank
 
-    # Drop internal fields before returning.
-    cleaned = []
-    for entry in candidates:
-        cleaned.append(
-            {
-                "id": entry["id"],
-                "score": float(entry["score"]),
-                "page_start": entry["page_start"],
-                "page_end": entry["page_end"],
-                "start_char": entry["start_char"],
-                "end_char": entry["end_char"],
-                "preview": entry["preview"],
-            }
-        )
-    return cleaned
+async def search_async(
+    query: str,
+    top_k: int = DEFAULT_TOP_K,
+    rerank: bool = True,
+    store: ArtifactStore = ARTIFACT_STORE,
+    query_vector: Optional[np.ndarray] = None,
+    rerank_limit: Optional[int] = RERANK_LIMIT,
+) -> List[dict]:
+    """
+    Awaitable `search`: encoding and reranking run on ``ENCODE_POOL`` and the FAISS
+    scan plus candidate assembly on ``FAISS_POOL``, leaving the event loop free.
+    """
+    _check_searchable(top_k, store)
+    loop = asyncio.get_running_loop()
+    if query_vector is None:
+        query_vector = await loop.run_in_executor(ENCODE_POOL, store.encode_query, query)
+    candidates = await loop.run_in_executor(
+        FAISS_POOL, _retrieve_candidates, query_vector, top_k, rerank, store, rerank_limit
+    )
+    if not candidates:
+        return []
+    if not rerank:
+        return _finalize_results(query, candidates, top_k, rerank, store)
+    return await loop.run_in_executor(
+        ENCODE_POOL, _finalize_results, query, candidates, top_k, rerank, store
+    )
 
 
 def parse_args() -> argparse.Namespace:
@@ -337,6 +822,12 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Disable the optional CrossEncoder reranker.",
     )
+    parser.add_argument(
+        "--rerank-limit",
+        type=int,
+        default=RERANK_LIMIT,
+        help="Number of FAISS hits scored by the reranker (default: %(default)s).",
+    )
     parser.add_argument(
         "--pretty",
         action="store_true",
@@ -348,7 +839,15 @@ def parse_args() -> argparse.Namespace:
 def main() -> None:
     """CLI entrypoint for running semantic search from the shell."""
     args = parse_args()
-    results = search(args.query, top_k=args.k, rerank=not args.no_rerank)
+    if not args.no_rerank and ARTIFACT_STORE.is_ready():
+        # Load the reranker while the query itself loads the index and encoder.
+        RERANKER.preload()
+    results = search(
+        args.query,
+        top_k=args.k,
+        rerank=not args.no_rerank,
+        rerank_limit=args.rerank_limit,
+    )
     if args.pretty:
         print(json.dumps(results, ensure_ascii=False, indent=2))
     else:
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import asyncio
+from typing import List, Sequence
+
+import numpy as np
+
+from app.api.embed_batcher import EmbedBatcher
+
+
+def test_concurrent_queries_share_one_encode_call() -> None:
+    """Queries awaited together are encoded in a single deduplicated batch."""
+    calls: List[List[str]] = []
+
+    def encode(queries: Sequence[str]) -> np.ndarray:
+        calls.append(list(queries))
+        return np.array([[float(len(query))] for query in queries], dtype=np.float32)
+
+    async def scenario() -> List[np.ndarray]:
+        batcher = EmbedBatcher(encode, max_batch=8, max_wait=0.05)
+        return await asyncio.gather(
+            batcher.embed("a"), batcher.embed("bbb"), batcher.embed("a")
+        )
+
+    vectors = asyncio.run(scenario())
+    assert calls == [["a", "bbb"]]
+    assert [float(vector[0]) for vector in vectors] == [1.0, 3.0, 1.0]
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.api.retrieval_service import SemanticResultCache
+
+
+def _unit(values: list[float]) -> np.ndarray:
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def _result(chunk_id: str) -> dict:
+    return {
+        "id": chunk_id,
+        "score": 0.5,
+        "page_start": 1,
+        "page_end": 1,
+        "start_char": 0,
+        "end_char": 10,
+        "preview": "preview",
+    }
+
+
+def test_semantic_cache_hits_near_duplicates_with_matching_options() -> None:
+    """Near-identical query vectors reuse results only for the same top_k/rerank."""
+    cache = SemanticResultCache(maxsize=4, threshold=0.97)
+    cache.store(_unit([1.0, 0.0, 0.0]), 4, True, [_result("sym-000001")])
+
+    hit = cache.lookup(_unit([1.0, 0.05, 0.0]), 4, True)
+    assert hit is not None and hit[0]["id"] == "sym-000001"
+    assert cache.lookup(_unit([1.0, 0.05, 0.0]), 4, False) is None
+    assert cache.lookup(_unit([0.0, 1.0, 0.0]), 4, True) is None
+
+
+def test_semantic_cache_evicts_oldest_entry() -> None:
+    """Entries beyond ``maxsize`` push out the oldest stored query."""
+    cache = SemanticResultCache(maxsize=2, threshold=0.97)
+    cache.store(_unit([1.0, 0.0, 0.0]), 5, False, [_result("sym-000001")])
+    cache.store(_unit([0.0, 1.0, 0.0]), 5, False, [_result("sym-000002")])
+    cache.store(_unit([0.0, 0.0, 1.0]), 5, False, [_result("sym-000003")])
+
+    assert cache.lookup(_unit([1.0, 0.0, 0.0]), 5, False) is None
+    hit = cache.lookup(_unit([0.0, 0.0, 1.0]), 5, False)
+    assert hit is not None and hit[0]["id"] == "sym-000003"
@@ -4,13 +4,14 @@ from typing import List, Tuple
 
 import pytest
 
-from app.api.retrieval_service import retrieve
+from app.api import retrieval_service
+from app.api.retrieval_service import retrieve, SemanticResultCache
 from app.search import ARTIFACT_STORE, search
 
 
-def _fingerprint(results: List[dict]) -> List[Tuple[str, float]]:
+def _fingerprint(results: List[dict], places: int = 6) -> List[Tuple[str, float]]:
     """Reduce results to id/score pairs for deterministic comparison."""
-    return [(item["id"], round(float(item["score"]), 6)) for item in results]
+    return [(item["id"], round(float(item["score"]), places)) for item in results]
 
 
 @pytest.mark.skipif(not ARTIFACT_STORE.is_ready(), reason="retrieval artifacts not built")
@@ -23,12 +24,16 @@ def test_search_repeatable_without_rerank() -> None:
 
 
 @pytest.mark.skipif(not ARTIFACT_STORE.is_ready(), reason="retrieval artifacts not built")
-def test_search_repeatable_with_rerank_bridge() -> None:
+def test_search_repeatable_with_rerank_bridge(monkeypatch: pytest.MonkeyPatch) -> None:
     """Reranked retrieval should be stable across repeated queries."""
     query = "Path of discovery"
+    monkeypatch.setattr(retrieval_service, "RESULT_CACHE", SemanticResultCache())
     first = retrieve(query, top_k=4, rerank=True)
+    # A fresh result cache forces the second call through FAISS and the reranker.
+    monkeypatch.setattr(retrieval_service, "RESULT_CACHE", SemanticResultCache())
     second = retrieve(query, top_k=4, rerank=True)
-    assert _fingerprint(first) == _fingerprint(second)
+    # int8 reranker kernels may differ in the last digits between runs.
+    assert _fingerprint(first, places=4) == _fingerprint(second, places=4)
 
 
 @pytest.mark.skipif(not ARTIFACT_STORE.is_ready(), reason="retrieval artifacts not built")